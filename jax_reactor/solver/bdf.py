@@ -23,40 +23,38 @@ def _get_coefficients(bdf_coefficients):
     return newton_coefficients, error_coefficients
 
 
+# indices of the diagnostics vector carried through the solver loops
+_NUM_JACOBIAN_EVALUATIONS = 0
+_NUM_MATRIX_FACTORIZATIONS = 1
+_NUM_ODE_FN_EVALUATIONS = 2
+_STATUS = 3
+
+
 def _get_common_params_and_coefficients(
     ode_fn,
     initial_time,
     initial_state,
     atol,
     rtol,
-    min_step_size_factor,
-    max_step_size_factor,
+    scalar_params,
     max_order,
-    max_num_newton_iters,
-    max_num_steps,
-    newton_tol_factor,
-    newton_step_size_factor,
-    safety_factor,
     bdf_coefficients,
 ):
     # krishna: find jaxy way of flatten
-    # convert everything to jnp arrays
+    # the scalar parameters are packed by `bdf_solve` so that they are
+    # transferred to the device as one array
+    [
+        min_step_size_factor,
+        max_step_size_factor,
+        max_num_steps,
+        max_num_newton_iters,
+        newton_tol_factor,
+        newton_step_size_factor,
+        safety_factor,
+    ] = scalar_params
     atol, rtol = jnp.array(atol, dtype=jnp.float64), jnp.array(rtol, dtype=jnp.float64)
-    min_step_size_factor, max_step_size_factor = (
-        jnp.array(min_step_size_factor, dtype=jnp.float64),
-        jnp.array(max_step_size_factor, dtype=jnp.float64),
-    )
-    max_order, max_num_newton_iters = (
-        jnp.array(max_order, dtype=jnp.int64),
-        jnp.array(max_num_newton_iters, dtype=jnp.int64),
-    )
-    max_num_steps = jnp.array(max_num_steps, dtype=jnp.float64)
-    newton_tol_factor, newton_step_size_factor = (
-        jnp.array(newton_tol_factor, dtype=jnp.float64),
-        jnp.array(newton_step_size_factor, dtype=jnp.float64),
-    )
-    safety_factor = jnp.array(safety_factor, dtype=jnp.float64)
-    bdf_coefficients = jnp.array(bdf_coefficients, dtype=jnp.float64)
+    # max_order is static and stays a python int
+    max_num_newton_iters = max_num_newton_iters.astype(jnp.int64)
     initial_state_vec = initial_state.flatten()
     ode_fn_vec = bdf_util.get_ode_fn_vec(ode_fn, initial_time, initial_state)
     num_odes = jnp.shape(initial_state_vec)[0]
@@ -87,71 +85,37 @@ def _get_common_params_and_coefficients(
     return _params, _coefficients
 
 
-def _initialize_solver_internal_state(
-    ode_fn,
-    initial_time,
-    initial_state,
-    atol,
-    rtol,
-    min_step_size_factor,
-    max_step_size_factor,
-    max_order,
-    max_num_newton_iters,
-    max_num_steps,
-    newton_tol_factor,
-    newton_step_size_factor,
-    safety_factor,
-    bdf_coefficients,
-):
-
-    p, e = _get_common_params_and_coefficients(
-        ode_fn,
-        initial_time,
-        initial_state,
-        atol,
-        rtol,
-        min_step_size_factor,
-        max_step_size_factor,
-        max_order,
-        max_num_newton_iters,
-        max_num_steps,
-        newton_tol_factor,
-        newton_step_size_factor,
-        safety_factor,
-        bdf_coefficients,
-    )
+def _initialize_solver_internal_state(p, e):
 
     first_step_size = bdf_util.first_step_size(
-        atol=atol,
+        atol=p.atol,
         first_order_error_coefficient=e.error_coefficients[1],
         initial_state_vec=p.initial_state_vec,
-        initial_time=initial_time,
+        initial_time=p.initial_time,
         ode_fn_vec=p.ode_fn_vec,
-        rtol=rtol,
-        safety_factor=safety_factor,
+        rtol=p.rtol,
+        safety_factor=p.safety_factor,
     )
 
     first_order_backward_difference = (
-        p.ode_fn_vec(initial_time, p.initial_state_vec) * first_step_size
+        p.ode_fn_vec(p.initial_time, p.initial_state_vec) * first_step_size
     )
 
-    backward_differences = jnp.concatenate(
-        [
-            p.initial_state_vec[jnp.newaxis, :],
-            first_order_backward_difference[jnp.newaxis, :],
-            jnp.zeros(
-                jnp.array(
-                    jnp.stack((bdf_util.MAX_ORDER + 1, p.num_odes)), dtype=jnp.int64
-                )
-            ),
-        ],
-        axis=0,
+    backward_differences = jnp.zeros(
+        (bdf_util.MAX_ORDER + 3, p.num_odes), dtype=jnp.float64
+    )
+    backward_differences = jax.ops.index_update(
+        backward_differences, jax.ops.index[0], p.initial_state_vec
+    )
+    backward_differences = jax.ops.index_update(
+        backward_differences, jax.ops.index[1], first_order_backward_difference
     )
     return _BDFSolverInternalState(
         backward_differences=backward_differences, order=1, step_size=first_step_size
     )
 
 
+@partial(jax.jit, static_argnums=(0, 3, 7, 9, 10, 11))
 def _solve(
     ode_fn,
     initial_state,
@@ -159,65 +123,41 @@ def _solve(
     jacobian_fn,
     atol,
     rtol,
-    min_step_size_factor,
-    max_step_size_factor,
+    scalar_params,
     max_order,
-    max_num_newton_iters,
-    max_num_steps,
-    newton_tol_factor,
-    newton_step_size_factor,
-    safety_factor,
     bdf_coefficients,
+    evaluate_jacobian_lazily,
+    dtype,
+    precision,
 ):
     initial_time = solution_times[0]
 
-    def advance_to_solution_time(_states):
-        """Takes multiple steps to advance time to `solution_times[n]`."""
-        n, diagnostics, iterand, solver_internal_state, state_vec, times = _states
+    def advance_to_solution_time(_states, nth_solution_time):
+        """Takes multiple steps to advance time to `nth_solution_time`."""
+        diagnostics, iterand, solver_internal_state = _states
+        failed = jnp.not_equal(diagnostics[_STATUS], 0)
 
         def step_cond(_states):
-            next_time, diagnostics, iterand, *_ = _states
-            return (iterand.time < next_time) & (jnp.equal(diagnostics.status, 0))
+            next_time, diagnostics, iterand, _ = _states
+            return (iterand.time < next_time) & (jnp.equal(diagnostics[_STATUS], 0))
 
-        nth_solution_time = solution_times[n]
-
-        [
-            _,
-            diagnostics,
-            iterand,
-            solver_internal_state,
-            state_vec,
-            times,
-        ] = jax.lax.while_loop(
+        [_, diagnostics, iterand, solver_internal_state] = jax.lax.while_loop(
             step_cond,
             step,
-            [
-                nth_solution_time,
-                diagnostics,
-                iterand,
-                solver_internal_state,
-                state_vec,
-                times,
-            ],
+            [nth_solution_time, diagnostics, iterand, solver_internal_state],
         )
 
-        state_vec = jax.ops.index_update(
-            state_vec, jax.ops.index[n], solver_internal_state.backward_differences[0]
+        # Solution times past a failure are left as zeros.
+        state_vec = jnp.where(
+            failed, 0.0, solver_internal_state.backward_differences[0]
         )
-        times = jax.ops.index_update(times, jax.ops.index[n], nth_solution_time)
+        time = jnp.where(failed, 0.0, nth_solution_time)
 
-        return (n + 1, diagnostics, iterand, solver_internal_state, state_vec, times)
+        return (diagnostics, iterand, solver_internal_state), (state_vec, time)
 
     def step(_states):
         """Takes a single step."""
-        (
-            next_time,
-            diagnostics,
-            iterand,
-            solver_internal_state,
-            state_vec,
-            times,
-        ) = _states
+        next_time, diagnostics, iterand, solver_internal_state = _states
         distance_to_next_time = next_time - iterand.time
         overstepped = iterand.new_step_size > distance_to_next_time
         iterand = iterand._replace(
@@ -226,59 +166,57 @@ def _solve(
             ),
             should_update_step_size=overstepped | iterand.should_update_step_size,
         )
-        # lazy jacobian evaluation ?
-
-        diagnostics = diagnostics._replace(
-            num_jacobian_evaluations=diagnostics.num_jacobian_evaluations + 1
-        )
-        iterand = iterand._replace(
-            jacobian_mat=jacobian_fn(
+        if not evaluate_jacobian_lazily:
+            # The Jacobian is refreshed once per step.
+            diagnostics = jax.ops.index_add(
+                diagnostics, jax.ops.index[_NUM_JACOBIAN_EVALUATIONS], 1
+            )
+            jacobian_mat = jacobian_fn(
                 iterand.time, solver_internal_state.backward_differences[0]
-            ),
-            jacobian_is_up_to_date=True,
-        )
+            ).astype(dtype)
+            iterand = iterand._replace(
+                jacobian_is_up_to_date=True,
+                matrices=jax.ops.index_update(
+                    iterand.matrices, jax.ops.index[0], jacobian_mat
+                ),
+                should_update_factorization=True,
+            )
 
         def maybe_step_cond(_states):
             accepted, diagnostics, *_ = _states
-            return jnp.logical_not(accepted) & jnp.equal(diagnostics.status, 0)
+            return jnp.logical_not(accepted) & jnp.equal(diagnostics[_STATUS], 0)
 
         _, diagnostics, iterand, solver_internal_state = jax.lax.while_loop(
             maybe_step_cond,
             maybe_step,
             (False, diagnostics, iterand, solver_internal_state),
         )
-        return [
-            next_time,
-            diagnostics,
-            iterand,
-            solver_internal_state,
-            state_vec,
-            times,
-        ]
+        return [next_time, diagnostics, iterand, solver_internal_state]
 
     def maybe_step(_states):
         """Takes a single step only if the outcome has a low enough error."""
         accepted, diagnostics, iterand, solver_internal_state = _states
         [
-            num_jacobian_evaluations,
-            num_matrix_factorizations,
-            num_ode_fn_evaluations,
-            status,
-        ] = diagnostics
-        [
-            jacobian_mat,
             jacobian_is_up_to_date,
+            matrices,
             new_step_size,
             num_steps,
             num_steps_same_size,
+            should_update_factorization,
             should_update_jacobian,
             should_update_step_size,
             time,
-            unitary,
-            upper,
         ] = iterand
         [backward_differences, order, step_size] = solver_internal_state
-        status = jnp.where(jnp.equal(num_steps, max_num_steps), -1, 0)
+        diagnostics = jax.ops.index_update(
+            diagnostics,
+            jax.ops.index[_STATUS],
+            jnp.where(jnp.equal(num_steps, p.max_num_steps), -1, 0),
+        )
+
+        # Interpolating the backward differences is cheap enough to be selected
+        # rather than branched on. It is not the identity for a unit step size
+        # ratio: differences above `order` are zeroed, so the select is needed.
         backward_differences = jnp.where(
             should_update_step_size,
             bdf_util.interpolate_backward_differences(
@@ -287,22 +225,65 @@ def _solve(
             backward_differences,
         )
         step_size = jnp.where(should_update_step_size, new_step_size, step_size)
-        should_update_factorization = (
-            should_update_step_size  # pylint: disable=unused-variable
-        )
         num_steps_same_size = jnp.where(should_update_step_size, 0, num_steps_same_size)
 
-        def update_factorization():
-            return bdf_util.newton_qr(
-                jacobian_mat, e.newton_coefficients[order], step_size
+        if evaluate_jacobian_lazily:
+
+            def update_jacobian(_operand):
+                jacobian_mat = jacobian_fn(time, backward_differences[0]).astype(dtype)
+                return (
+                    jax.ops.index_update(matrices, jax.ops.index[0], jacobian_mat),
+                    True,
+                    jax.ops.index_add(
+                        diagnostics, jax.ops.index[_NUM_JACOBIAN_EVALUATIONS], 1
+                    ),
+                )
+
+            # The Jacobian is only evaluated after Newton's method failed with a
+            # stale one.
+            matrices, jacobian_is_up_to_date, diagnostics = jax.lax.cond(
+                should_update_jacobian,
+                None,
+                update_jacobian,
+                (matrices, jacobian_is_up_to_date, diagnostics),
+                lambda _operand: _operand,
             )
 
-        # lazy jacobian evaluation?
-        unitary, upper = update_factorization()
-        num_matrix_factorizations += 1
+        # The Newton matrix `I - step_size * newton_coefficient * jacobian_mat`
+        # only changes with the Jacobian, the step size or the order, so the
+        # cached factorization is reused otherwise.
+        should_update_factorization = (
+            should_update_factorization
+            | should_update_jacobian
+            | should_update_step_size
+        )
+
+        newton_coefficient = e.newton_coefficients[order]
+
+        # Only the slices of the factorization are written, the Jacobian slice is
+        # left in place.
+        def update_factorization(_operand):
+            unitary, upper = bdf_util.newton_qr(
+                matrices[0], newton_coefficient, step_size
+            )
+            matrices_ = jax.ops.index_update(matrices, jax.ops.index[1], unitary)
+            return jax.ops.index_update(matrices_, jax.ops.index[2], upper)
+
+        matrices = jax.lax.cond(
+            should_update_factorization,
+            None,
+            update_factorization,
+            matrices,
+            lambda _operand: _operand,
+        )
+        diagnostics = jax.ops.index_add(
+            diagnostics,
+            jax.ops.index[_NUM_MATRIX_FACTORIZATIONS],
+            jnp.where(should_update_factorization, 1, 0),
+        )
 
         tol = p.atol + p.rtol * jnp.abs(backward_differences[0])
-        newton_tol = newton_tol_factor * jnp.linalg.norm(tol)
+        newton_tol = p.newton_tol_factor * jnp.linalg.norm(tol)
 
         [
             newton_converged,
@@ -311,25 +292,28 @@ def _solve(
             newton_num_iters,
         ] = bdf_util.newton(
             backward_differences,
-            max_num_newton_iters,
-            e.newton_coefficients[order],
+            p.max_num_newton_iters,
+            newton_coefficient,
             p.ode_fn_vec,
             order,
             step_size,
             time,
             newton_tol,
-            unitary,
-            upper,
+            matrices[1],
+            matrices[2],
+            precision,
         )
         num_steps += 1
-        num_ode_fn_evaluations += newton_num_iters
+        diagnostics = jax.ops.index_add(
+            diagnostics, jax.ops.index[_NUM_ODE_FN_EVALUATIONS], newton_num_iters
+        )
 
         # If Newton's method failed and the Jacobian was up to date, decrease the
         # step size.
         newton_failed = jnp.logical_not(newton_converged)
         should_update_step_size = newton_failed & jacobian_is_up_to_date
         new_step_size = step_size * jnp.where(
-            should_update_step_size, newton_step_size_factor, 1.0
+            should_update_step_size, p.newton_step_size_factor, 1.0
         )
 
         # If Newton's method failed and the Jacobian was NOT up to date, update
@@ -345,99 +329,157 @@ def _solve(
         )
         accepted = error_ratio < 1.0
         converged_and_rejected = newton_converged & jnp.logical_not(accepted)
-
-        # If Newton's method converged but the solution was NOT accepted, decrease
-        # the step size.
-        new_step_size = jnp.where(
-            converged_and_rejected,
-            bdf_util.next_step_size(
-                step_size,
-                order,
-                error_ratio,
-                p.safety_factor,
-                p.min_step_size_factor,
-                p.max_step_size_factor,
-            ),
-            new_step_size,
-        )
         should_update_step_size = should_update_step_size | converged_and_rejected
 
-        # If Newton's method converged and the solution was accepted, update the
-        # matrix of backward differences.
-        time = jnp.where(accepted, time + step_size, time)
-        backward_differences = jnp.where(
-            accepted,
-            bdf_util.update_backward_differences(
+        def accept_step(_operand):
+            """Updates the state after a step that has a low enough error."""
+            [
+                backward_differences,
+                error_ratio,
+                jacobian_is_up_to_date,
+                new_step_size,
+                num_steps_same_size,
+                order,
+                should_update_step_size,
+                time,
+            ] = _operand
+
+            # Newton's method converged and the solution was accepted, update the
+            # matrix of backward differences.
+            time = time + step_size
+            backward_differences = bdf_util.update_backward_differences(
                 backward_differences, next_backward_difference, next_state_vec, order
-            ),
-            backward_differences,
-        )
-        jacobian_is_up_to_date = jacobian_is_up_to_date & jnp.logical_not(accepted)
-        num_steps_same_size = jnp.where(
-            accepted, num_steps_same_size + 1, num_steps_same_size
-        )
-
-        # Order and step size are only updated if we have taken strictly more than
-        # order + 1 steps of the same size. This is to prevent the order from
-        # being throttled.
-        should_update_order_and_step_size = accepted & (num_steps_same_size > order + 1)
-        new_order = order
-        new_error_ratio = error_ratio
-        for offset in [-1, +1]:
-            proposed_order = jnp.clip(order + offset, 1, max_order)
-            proposed_error_ratio = bdf_util.error_ratio(
-                backward_differences[proposed_order + 1],
-                e.error_coefficients[proposed_order],
-                tol,
             )
-            proposed_error_ratio_is_lower = proposed_error_ratio < new_error_ratio
-            new_order = jnp.where(
-                should_update_order_and_step_size & proposed_error_ratio_is_lower,
-                proposed_order,
-                new_order,
+            jacobian_is_up_to_date = False
+            num_steps_same_size = num_steps_same_size + 1
+
+            # Order and step size are only updated if we have taken strictly more
+            # than order + 1 steps of the same size. This is to prevent the order
+            # from being throttled.
+            should_update_order_and_step_size = num_steps_same_size > order + 1
+
+            # The current order comes first so that it is kept on ties, followed
+            # by the lower order so that it is preferred over the higher one.
+            # The error ratio at the current order is the one the step was accepted
+            # with, so only the neighbouring orders are evaluated.
+            proposed_orders = jnp.clip(order + jnp.array([0, -1, +1]), 1, max_order)
+            neighbouring_error_ratios = jax.vmap(
+                lambda proposed_order: bdf_util.error_ratio(
+                    backward_differences[proposed_order + 1],
+                    e.error_coefficients[proposed_order],
+                    tol,
+                )
+            )(proposed_orders[1:])
+            proposed_error_ratios = jnp.concatenate(
+                [error_ratio[jnp.newaxis], neighbouring_error_ratios]
             )
-            new_error_ratio = jnp.where(
-                should_update_order_and_step_size & proposed_error_ratio_is_lower,
-                proposed_error_ratio,
-                new_error_ratio,
+            best = jnp.argmin(proposed_error_ratios)
+            order = jnp.where(
+                should_update_order_and_step_size, proposed_orders[best], order
+            )
+            error_ratio = jnp.where(
+                should_update_order_and_step_size,
+                proposed_error_ratios[best],
+                error_ratio,
             )
-        order = new_order
-        error_ratio = new_error_ratio
 
-        new_step_size = jnp.where(
-            should_update_order_and_step_size,
-            bdf_util.next_step_size(
-                step_size,
+            new_step_size = jnp.where(
+                should_update_order_and_step_size,
+                bdf_util.next_step_size(
+                    step_size,
+                    order,
+                    error_ratio,
+                    p.safety_factor,
+                    p.min_step_size_factor,
+                    p.max_step_size_factor,
+                ),
+                new_step_size,
+            )
+            should_update_step_size = (
+                should_update_step_size | should_update_order_and_step_size
+            )
+            return [
+                backward_differences,
+                error_ratio,
+                jacobian_is_up_to_date,
+                new_step_size,
+                num_steps_same_size,
                 order,
+                should_update_step_size,
+                time,
+            ]
+
+        def reject_step(_operand):
+            """Shrinks the step size after a step that has too high an error."""
+            [
+                backward_differences,
                 error_ratio,
-                p.safety_factor,
-                p.min_step_size_factor,
-                p.max_step_size_factor,
-            ),
-            new_step_size,
-        )
-        should_update_step_size = (
-            should_update_step_size | should_update_order_and_step_size
-        )
+                jacobian_is_up_to_date,
+                new_step_size,
+                num_steps_same_size,
+                order,
+                should_update_step_size,
+                time,
+            ] = _operand
+
+            # If Newton's method converged but the solution was NOT accepted,
+            # decrease the step size.
+            new_step_size = jnp.where(
+                converged_and_rejected,
+                bdf_util.next_step_size(
+                    step_size,
+                    order,
+                    error_ratio,
+                    p.safety_factor,
+                    p.min_step_size_factor,
+                    p.max_step_size_factor,
+                ),
+                new_step_size,
+            )
+            return [
+                backward_differences,
+                error_ratio,
+                jacobian_is_up_to_date,
+                new_step_size,
+                num_steps_same_size,
+                order,
+                should_update_step_size,
+                time,
+            ]
 
-        diagnostics = _BDFDiagnostics(
-            num_jacobian_evaluations,
-            num_matrix_factorizations,
-            num_ode_fn_evaluations,
-            status,
-        )
+        # Only the branch matching the outcome of the step is evaluated.
+        _operand = [
+            backward_differences,
+            error_ratio,
+            jacobian_is_up_to_date,
+            new_step_size,
+            num_steps_same_size,
+            order,
+            should_update_step_size,
+            time,
+        ]
+        [
+            backward_differences,
+            error_ratio,
+            jacobian_is_up_to_date,
+            new_step_size,
+            num_steps_same_size,
+            order,
+            should_update_step_size,
+            time,
+        ] = jax.lax.cond(accepted, _operand, accept_step, _operand, reject_step)
+        should_update_factorization = jnp.not_equal(order, solver_internal_state.order)
 
         iterand = _BDFIterand(
-            jacobian_mat,
             jacobian_is_up_to_date,
+            matrices,
             new_step_size,
             num_steps,
             num_steps_same_size,
+            should_update_factorization,
             should_update_jacobian,
             should_update_step_size,
             time,
-            unitary,
-            upper,
         )
 
         solver_internal_state = _BDFSolverInternalState(
@@ -445,90 +487,48 @@ def _solve(
         )
         return accepted, diagnostics, iterand, solver_internal_state
 
-    solver_internal_state = _initialize_solver_internal_state(
-        ode_fn,
-        initial_time,
-        initial_state,
-        atol,
-        rtol,
-        min_step_size_factor,
-        max_step_size_factor,
-        max_order,
-        max_num_newton_iters,
-        max_num_steps,
-        newton_tol_factor,
-        newton_step_size_factor,
-        safety_factor,
-        bdf_coefficients,
-    )
-
     p, e = _get_common_params_and_coefficients(
         ode_fn,
         initial_time,
         initial_state,
         atol,
         rtol,
-        min_step_size_factor,
-        max_step_size_factor,
+        scalar_params,
         max_order,
-        max_num_newton_iters,
-        max_num_steps,
-        newton_tol_factor,
-        newton_step_size_factor,
-        safety_factor,
         bdf_coefficients,
     )
+    solver_internal_state = _initialize_solver_internal_state(p, e)
 
-    diagnostics = _BDFDiagnostics(
-        num_jacobian_evaluations=0,
-        num_matrix_factorizations=0,
-        num_ode_fn_evaluations=0,
-        status=0,
-    )
+    # The diagnostics are carried as a single vector indexed like `_BDFDiagnostics`
+    diagnostics = jnp.zeros(len(_BDFDiagnostics._fields), dtype=jnp.int64)
 
     iterand = _BDFIterand(
-        jacobian_mat=jnp.zeros([p.num_odes, p.num_odes]),
         jacobian_is_up_to_date=False,
+        matrices=jnp.zeros([3, p.num_odes, p.num_odes], dtype=dtype),
         new_step_size=solver_internal_state.step_size,
         num_steps=0,
         num_steps_same_size=0,
+        should_update_factorization=True,
         should_update_jacobian=True,
         should_update_step_size=False,
         time=p.initial_time,
-        unitary=jnp.zeros([p.num_odes, p.num_odes]),
-        upper=jnp.zeros([p.num_odes, p.num_odes]),
     )
 
-    num_solution_times = jnp.shape(solution_times)[0]
-    state_vec_size = jnp.shape(initial_state)[0]
-    state_vec = jnp.zeros([num_solution_times, state_vec_size], dtype=jnp.float64)
-    times = jnp.zeros([num_solution_times], dtype=jnp.float64)
-
-    def advance_to_solution_time_cond(_states):
-        n, diagnostics, *_ = _states
-        return (n < num_solution_times) & (jnp.equal(diagnostics.status, 0))
-
-    [
-        _,
-        diagnostics,
-        iterand,
-        solver_internal_state,
-        state_vec,
-        times,
-    ] = jax.lax.while_loop(
-        advance_to_solution_time_cond,
+    # The solution times are scanned over, so XLA stacks the states at each
+    # solution time into the output instead of updating a preallocated buffer.
+    (diagnostics, iterand, solver_internal_state), (state_vec, times) = jax.lax.scan(
         advance_to_solution_time,
-        (0, diagnostics, iterand, solver_internal_state, state_vec, times),
+        (diagnostics, iterand, solver_internal_state),
+        solution_times,
     )
     return Results(
         times=times,
         states=state_vec,
-        diagnostics=diagnostics,
+        diagnostics=_BDFDiagnostics(*diagnostics),
         solver_internal_state=solver_internal_state,
     )
 
 
-@partial(jax.jit, static_argnums=(0, 3))
 def bdf_solve(
     ode_fn,
     initial_state,
@@ -545,7 +545,44 @@ def bdf_solve(
     newton_step_size_factor=0.5,
     safety_factor=0.9,
     bdf_coefficients=[0.0, 0.1850, -1.0 / 9.0, -0.0823, -0.0415, 0.0],
+    evaluate_jacobian_lazily=False,
+    dtype=jnp.float64,
+    precision=jax.lax.Precision.HIGHEST,
 ):
+    """
+    Integrates a stiff system of ODEs with the BDF method
+
+    `dtype` is the working precision of the Jacobian and of the QR factorization
+    and triangular solves of Newton's method. The state, residuals and error
+    control are kept in `jnp.float64` whatever the dtype of `initial_state`,
+    which is double precision only when the caller has enabled
+    `jax_enable_x64` (otherwise JAX silently computes everything in float32).
+    Lowering `dtype` to `jnp.float32` then trades some Newton convergence speed
+    for cheaper linear algebra, each Newton iteration acting as a refinement
+    step.
+
+    `precision` is the `jax.lax.Precision` of the matrix products of Newton's
+    method. With `jnp.float32` as `dtype`, `jax.lax.Precision.DEFAULT` lets
+    Ampere and newer GPUs use TF32 TensorCores, roughly doubling their matmul
+    throughput for mechanisms with hundreds of species.
+    """
+
+    # Python scalars are transferred to the device one by one when passed to a
+    # jitted function, so they are packed into arrays beforehand. The integer
+    # max_num_newton_iters is exactly representable and is packed as a float.
+    scalar_params = jnp.array(
+        [
+            min_step_size_factor,
+            max_step_size_factor,
+            max_num_steps,
+            max_num_newton_iters,
+            newton_tol_factor,
+            newton_step_size_factor,
+            safety_factor,
+        ],
+        dtype=jnp.float64,
+    )
+    bdf_coefficients = jnp.array(bdf_coefficients, dtype=jnp.float64)
 
     results = _solve(
         ode_fn,
@@ -554,20 +591,35 @@ def bdf_solve(
         jacobian_fn,
         atol,
         rtol,
-        min_step_size_factor,
-        max_step_size_factor,
+        scalar_params,
         max_order,
-        max_num_newton_iters,
-        max_num_steps,
-        newton_tol_factor,
-        newton_step_size_factor,
-        safety_factor,
         bdf_coefficients,
+        evaluate_jacobian_lazily,
+        dtype,
+        precision,
     )
 
     return results
 
 
+def bdf_solve_batched(ode_fn, initial_states, solution_times, jacobian_fn, **kwargs):
+    """
+    Integrates a batch of initial states, stacked along the leading axis of
+    `initial_states`, as a single vectorized program
+
+    `kwargs` are the solver parameters of `bdf_solve`, shared by the batch.
+    Every field of the returned `Results` gains a leading batch axis.
+
+    The loops of the solver run until every trajectory of the batch is done, so
+    a batch costs about as many steps as its slowest trajectory.
+    """
+
+    def solve(initial_state):
+        return bdf_solve(ode_fn, initial_state, solution_times, jacobian_fn, **kwargs)
+
+    return jax.vmap(solve)(initial_states)
+
+
 class Results(
     collections.namedtuple(
         "Results", ["times", "states", "diagnostics", "solver_internal_state"]
@@ -624,48 +676,48 @@ class _BDFIterand(
     collections.namedtuple(
         "_BDFIterand",
         [
-            "jacobian_mat",
             "jacobian_is_up_to_date",
+            "matrices",
             "new_step_size",
             "num_steps",
             "num_steps_same_size",
+            "should_update_factorization",
             "should_update_jacobian",
             "should_update_step_size",
             "time",
-            "unitary",
-            "upper",
         ],
     )
 ):
     """
     namedtuple class to store iterand state
+
+    `matrices` stacks the Jacobian and the unitary and upper triangular QR
+    factors of the Newton matrix into a single (3, num_odes, num_odes) array
     """
 
     def __new__(
         cls,
-        jacobian_mat,
         jacobian_is_up_to_date,
+        matrices,
         new_step_size,
         num_steps,
         num_steps_same_size,
+        should_update_factorization,
         should_update_jacobian,
         should_update_step_size,
         time,
-        unitary,
-        upper,
     ):
         return super(_BDFIterand, cls).__new__(
             cls,
-            jacobian_mat,
             jacobian_is_up_to_date,
+            matrices,
             new_step_size,
             num_steps,
             num_steps_same_size,
+            should_update_factorization,
             should_update_jacobian,
             should_update_step_size,
             time,
-            unitary,
-            upper,
         )
 
 
@@ -0,0 +1,147 @@
+import jax
+import jax.numpy as np
+import numpy as onp
+from jax.config import config
+from jax.experimental import host_callback
+
+config.update("jax_enable_x64", True)
+
+# local imports
+from jax_reactor.solver import bdf
+
+
+def robertson_ode_fn(time, state):
+    return np.array(
+        [
+            -0.04 * state[0] + 1e4 * state[1] * state[2],
+            0.04 * state[0] - 1e4 * state[1] * state[2] - 3e7 * state[1] ** 2,
+            3e7 * state[1] ** 2,
+        ]
+    )
+
+
+robertson_jacobian_fn = jax.jacfwd(robertson_ode_fn, argnums=1)
+
+
+def test_bdf_solve_lazy_jacobian_matches_default():
+    initial_state = np.array([1.0, 0.0, 0.0], dtype=np.float64)
+    solution_times = np.array([0.0, 0.1, 1.0, 10.0, 100.0], dtype=np.float64)
+    results = bdf.bdf_solve(
+        robertson_ode_fn, initial_state, solution_times, robertson_jacobian_fn
+    )
+    lazy_results = bdf.bdf_solve(
+        robertson_ode_fn,
+        initial_state,
+        solution_times,
+        robertson_jacobian_fn,
+        evaluate_jacobian_lazily=True,
+    )
+    onp.testing.assert_equal(onp.asarray(lazy_results.diagnostics.status), 0)
+    onp.testing.assert_allclose(
+        lazy_results.states, results.states, rtol=1e-4, atol=1e-10
+    )
+    # A stale Jacobian is kept until Newton's method fails with it, and the
+    # factorization is kept until the Jacobian, the step size or the order
+    # changes.
+    onp.testing.assert_array_less(
+        lazy_results.diagnostics.num_jacobian_evaluations,
+        results.diagnostics.num_jacobian_evaluations,
+    )
+    onp.testing.assert_array_less(
+        lazy_results.diagnostics.num_matrix_factorizations,
+        results.diagnostics.num_matrix_factorizations,
+    )
+
+
+def test_bdf_solve_single_precision_linear_algebra_matches_default():
+    initial_state = np.array([1.0, 0.0, 0.0], dtype=np.float64)
+    solution_times = np.array([0.0, 0.1, 1.0, 10.0, 100.0], dtype=np.float64)
+    results = bdf.bdf_solve(
+        robertson_ode_fn, initial_state, solution_times, robertson_jacobian_fn
+    )
+    single_precision_results = bdf.bdf_solve(
+        robertson_ode_fn,
+        initial_state,
+        solution_times,
+        robertson_jacobian_fn,
+        dtype=np.float32,
+    )
+    onp.testing.assert_equal(
+        onp.asarray(single_precision_results.diagnostics.status), 0
+    )
+    # The state stays in double precision, so only the Newton iterations are
+    # affected by the lower precision of the linear algebra.
+    onp.testing.assert_equal(single_precision_results.states.dtype, np.float64)
+    onp.testing.assert_allclose(
+        single_precision_results.states, results.states, rtol=1e-6, atol=1e-12
+    )
+
+
+def test_bdf_solve_batched_matches_bdf_solve():
+    initial_states = np.array(
+        [[1.0, 0.0, 0.0], [0.5, 0.0, 0.5], [0.9, 1e-5, 0.1]], dtype=np.float64
+    )
+    solution_times = np.array([0.0, 0.1, 1.0, 10.0], dtype=np.float64)
+    batched_results = bdf.bdf_solve_batched(
+        robertson_ode_fn, initial_states, solution_times, robertson_jacobian_fn
+    )
+    onp.testing.assert_equal(
+        onp.asarray(batched_results.diagnostics.status), onp.zeros(3)
+    )
+    for i, initial_state in enumerate(initial_states):
+        results = bdf.bdf_solve(
+            robertson_ode_fn, initial_state, solution_times, robertson_jacobian_fn
+        )
+        onp.testing.assert_allclose(
+            batched_results.states[i],
+            results.states,
+            rtol=1e-10,
+            err_msg="batched and unbatched states are not equal",
+        )
+        onp.testing.assert_allclose(batched_results.times[i], results.times)
+
+
+def test_bdf_solve_batched_work_is_bounded_by_slowest_trajectory():
+    num_ode_fn_calls = [0]
+
+    def count_ode_fn_calls(arg, **kwargs):
+        num_ode_fn_calls[0] += 1
+
+    def counted_ode_fn(time, state):
+        state = host_callback.id_tap(count_ode_fn_calls, state)
+        return robertson_ode_fn(time, state)
+
+    counted_jacobian_fn = jax.jacfwd(counted_ode_fn, argnums=1)
+    initial_states = np.array(
+        [[1.0 - 0.01 * i, 0.0, 0.01 * i] for i in range(8)], dtype=np.float64
+    )
+    solution_times = np.linspace(0.0, 10.0, 40)
+
+    with host_callback.outfeed_receiver():
+        unbatched_num_ode_fn_calls = []
+        for initial_state in initial_states:
+            num_ode_fn_calls[0] = 0
+            results = bdf.bdf_solve(
+                counted_ode_fn, initial_state, solution_times, counted_jacobian_fn
+            )
+            results.states.block_until_ready()
+            unbatched_num_ode_fn_calls.append(num_ode_fn_calls[0])
+
+        num_ode_fn_calls[0] = 0
+        results = bdf.bdf_solve_batched(
+            counted_ode_fn, initial_states, solution_times, counted_jacobian_fn
+        )
+        results.states.block_until_ready()
+
+    # Each call evaluates the whole batch, whose loops run as long as their
+    # slowest trajectory, so the batch costs about as much as one trajectory.
+    onp.testing.assert_array_less(
+        num_ode_fn_calls[0], 2 * max(unbatched_num_ode_fn_calls)
+    )
+
+
+if __name__ == "__main__":
+    test_bdf_solve_lazy_jacobian_matches_default()
+    test_bdf_solve_single_precision_linear_algebra_matches_default()
+    test_bdf_solve_batched_matches_bdf_solve()
+    test_bdf_solve_batched_work_is_bounded_by_slowest_trajectory()
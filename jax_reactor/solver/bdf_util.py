@@ -99,9 +99,8 @@ def interpolate_backward_differences(
             backward_differences[0].reshape(1, np.shape(backward_differences)[1]),
             interpolated_backward_differences_orders_one_to_five,
             np.zeros(
-                np.stack(
-                    np.array([2, np.shape(backward_differences)[1]], dtype=np.int64)
-                )
+                (2, np.shape(backward_differences)[1]),
+                dtype=backward_differences.dtype,
             ),
         ],
         axis=0,
@@ -170,12 +169,13 @@ def newton_qr(
 ) -> Tuple[np.ndarray, np.ndarray]:
     """QR factorizes the matrix used in each iteration of Newton's method."""
     identity = np.eye(np.shape(jacobian_mat)[0], dtype=jacobian_mat.dtype)
-    newton_matrix = identity - step_size * newton_coefficient * jacobian_mat
-    q, r = np.linalg.qr(newton_matrix)
+    scale = np.asarray(step_size * newton_coefficient, dtype=jacobian_mat.dtype)
+    newton_matrix = identity - scale * jacobian_mat
+    q, r = np.linalg.qr(newton_matrix, mode="reduced")
     return q, r
 
 
-@partial(jax.jit, static_argnums=(3,))
+@partial(jax.jit, static_argnums=(3, 10))
 def newton(
     backward_differences: np.ndarray,
     max_num_iters: Union[np.ndarray, float, int],
@@ -187,6 +187,7 @@ def newton(
     tol: Union[np.ndarray, float],
     unitary: np.ndarray,
     upper: np.ndarray,
+    precision: jax.lax.Precision,
 ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
     """Runs Newton's method to solve the BDF equation."""
     initial_guess = np.sum(
@@ -208,6 +209,8 @@ def newton(
     )
 
     next_time = time + step_size
+    # The factorization is fixed for all iterations, so is its transpose.
+    unitary_transpose = np.transpose(unitary)
 
     def newton_body(iterand):
         """Performs one iteration of Newton's method."""
@@ -219,11 +222,17 @@ def newton(
             - rhs_constant_term
             - next_backward_difference
         )
-        delta = np.squeeze(
-            jax.scipy.linalg.solve_triangular(
-                upper, np.matmul(np.transpose(unitary), rhs[:, np.newaxis]), lower=False
-            )
+        # The linear solve runs in the precision of the factorization, while the
+        # residual `rhs` and the update stay in the precision of the state.
+        projected_rhs = jax.lax.dot_general(
+            unitary_transpose,
+            rhs.astype(upper.dtype),
+            (((1,), (0,)), ((), ())),
+            precision=precision,
         )
+        delta = jax.scipy.linalg.solve_triangular(
+            upper, projected_rhs, lower=False
+        ).astype(rhs.dtype)
         num_iters = iterand.num_iters + 1
 
         next_backward_difference += delta
@@ -1,3 +1,4 @@
+import jax
 import jax.numpy as np
 import numpy as onp
 from jax.config import config
@@ -74,6 +75,27 @@ def test_interpolate_backward_differences_zeroth_order_is_unchanged():
     )
 
 
+def test_interpolate_backward_differences_unit_step_size_ratio():
+    backward_differences = np.array(
+        onp.random.normal(size=((bdf_util.MAX_ORDER + 3, 3))), dtype=np.float64
+    )
+    order = 2
+    step_size_ratio = np.array(1.0, dtype=np.float64)
+    interpolated_backward_differences = bdf_util.interpolate_backward_differences(
+        backward_differences, order, step_size_ratio
+    )
+    # Differences up to `order` are unchanged, the higher ones are zeroed.
+    onp.testing.assert_allclose(
+        backward_differences[: order + 1],
+        interpolated_backward_differences[: order + 1],
+        atol=1e-12,
+        err_msg="Interpolated backward differences are not equal",
+    )
+    onp.testing.assert_equal(
+        onp.asarray(interpolated_backward_differences[order + 1 :]), 0.0
+    )
+
+
 def test_newton_order_one():
     jacobian_mat = np.array([[-1.0]], dtype=np.float64)
     bdf_coefficient = np.array(-0.1850, dtype=np.float64)
@@ -108,6 +130,7 @@ def test_newton_order_one():
         tol,
         unitary,
         upper,
+        jax.lax.Precision.HIGHEST,
     )
     onp.testing.assert_equal(onp.asarray(converged), True)
 
@@ -120,8 +143,56 @@ def test_newton_order_one():
     onp.testing.assert_allclose(next_state, exact_next_state)
 
 
+def test_newton_order_one_single_precision_factorization():
+    jacobian_mat = np.array([[-1.0]], dtype=np.float32)
+    bdf_coefficient = np.array(-0.1850, dtype=np.float64)
+    first_order_newton_coefficient = 1.0 / (1.0 - bdf_coefficient)
+    step_size = np.array(0.01, dtype=np.float64)
+    unitary, upper = bdf_util.newton_qr(
+        jacobian_mat, first_order_newton_coefficient, step_size
+    )
+    onp.testing.assert_equal(upper.dtype, np.float32)
+
+    backward_differences = np.array(
+        [[1.0], [-1.0], [0.0], [0.0], [0.0], [0.0]], dtype=np.float64
+    )
+    ode_fn_vec = lambda time, state: -state
+    order = np.array(1, dtype=np.int32)
+    time = np.array(0.0, dtype=np.float64)
+    tol = np.array(1e-6, dtype=np.float64)
+    max_num_newton_iters = 2
+
+    # Smoke test of a lower precision: on CPU it has no effect on the result.
+    converged, next_backward_difference, next_state, _ = bdf_util.newton(
+        backward_differences,
+        max_num_newton_iters,
+        first_order_newton_coefficient,
+        ode_fn_vec,
+        order,
+        step_size,
+        time,
+        tol,
+        unitary,
+        upper,
+        jax.lax.Precision.DEFAULT,
+    )
+    onp.testing.assert_equal(onp.asarray(converged), True)
+    # The state stays in double precision even though the solve does not.
+    onp.testing.assert_equal(next_state.dtype, np.float64)
+
+    state = backward_differences[0, :]
+    exact_next_state = ((1.0 - bdf_coefficient) * state + bdf_coefficient) / (
+        1.0 + step_size - bdf_coefficient
+    )
+
+    onp.testing.assert_allclose(next_backward_difference, exact_next_state, rtol=1e-6)
+    onp.testing.assert_allclose(next_state, exact_next_state, rtol=1e-6)
+
+
 if __name__ == "__main__":
     test_first_step_size_is_large_when_ode_fn_is_constant()
     test_interpolation_matrix_unit_step_size_ratio()
     test_interpolate_backward_differences_zeroth_order_is_unchanged()
+    test_interpolate_backward_differences_unit_step_size_ratio()
     test_newton_order_one()
+    test_newton_order_one_single_precision_factorization()